@@ -1,18 +1,27 @@
 import streamlit as st
 import pandas as pd
-import requests
-import time
+import numpy as np
+import asyncio
+import httpx
 import datetime as dt
+import threading
+import pyarrow as pa
 from pymongo import MongoClient
-import pytz
+from pymongoarrow.api import Schema
+from pymongoarrow.monkey import patch_all
+from zoneinfo import ZoneInfo
 import os
 from dotenv import load_dotenv
 import plotly.graph_objects as go
+from streamlit_autorefresh import st_autorefresh
 
 # ======= CONFIGURAÇÕES =======
 load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI")
 REFRESH_INTERVAL = 60  # segundos
+SP_TZ = ZoneInfo("America/Sao_Paulo")
+CACHE_DIR = ".cache"
+os.makedirs(CACHE_DIR, exist_ok=True)
 
 st.set_page_config(
     page_title="Cotação do Dólar + Operações",
@@ -20,118 +29,219 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Rerun completo só quando o cache de dados (ttl=300) pode ter expirado;
+# a cotação ao vivo fica por conta do fragmento abaixo.
+st_autorefresh(interval=REFRESH_INTERVAL * 5 * 1000, key="dados_refresh")
+
+# Habilita find_arrow_all() nas Collections do PyMongo
+patch_all()
+
+# ======= Colunas usadas =======
+colunas_pedidos = ['Assunto', 'Status', 'Hora de Criação', 'Condição de Pagamento', 'Pedido Filho?', 'Quantidade Total', 'Produtos']
+colunas_ordens = ['Nome Produto', 'Quantidade Paga', 'Armazém', 'Hora de Criação', "Pedido de Compra"]
+
+schema_pedidos = Schema({
+    'Assunto': pa.string(),
+    'Status': pa.string(),
+    'Hora de Criação': pa.timestamp('ms'),
+    'Condição de Pagamento': pa.string(),
+    'Pedido Filho?': pa.string(),
+    'Quantidade Total': pa.float64(),
+    'Produtos': pa.string(),
+})
+schema_ordens = Schema({
+    'Nome Produto': pa.string(),
+    'Quantidade Paga': pa.float64(),
+    'Armazém': pa.string(),
+    'Hora de Criação': pa.timestamp('ms'),
+    'Pedido de Compra': pa.string(),
+})
+
+# ======= Event loop persistente (corrotinas fora do script thread) =======
+@st.cache_resource
+def get_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+def rodar_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_loop()).result()
+
+def limpar_espelhos_antigos(dias=30):
+    limite = dt.date.today() - dt.timedelta(days=dias)
+    for nome in os.listdir(CACHE_DIR):
+        if not nome.endswith(".parquet"):
+            continue
+        try:
+            data = dt.date.fromisoformat(nome[-18:-8])
+        except ValueError:
+            continue
+        if data < limite:
+            os.remove(os.path.join(CACHE_DIR, nome))
+
 # ======= Conexão MongoDB =======
-try:
-    client = MongoClient(MONGO_URI)
+@st.cache_resource
+def get_db():
+    client = MongoClient(MONGO_URI, maxPoolSize=10, serverSelectionTimeoutMS=3000)
     db = client["Zoho"]
+    db["Pedidos - CRM"].create_index([("Hora de Criação", 1), ("Status", 1)])
+    db["Ordens de compra - CRM"].create_index([("Hora de Criação", 1)])
+    limpar_espelhos_antigos()
+    return db
+
+try:
+    db = get_db()
 except Exception as e:
     st.error(f"Erro ao conectar ao MongoDB: {e}")
     st.stop()
 
 # ======= Funções auxiliares =======
-def carregar_pedidos():
-    try:
-        dados = list(db["Pedidos - CRM"].find())
-        return pd.DataFrame(dados) if dados else pd.DataFrame()
-    except Exception as e:
-        st.error(f"Erro ao carregar pedidos: {e}")
-        return pd.DataFrame()
+def filtro_dia(data_filtrada):
+    inicio = dt.datetime.combine(data_filtrada, dt.time.min)
+    fim = inicio + dt.timedelta(days=1)
+    return {"Hora de Criação": {"$gte": inicio, "$lt": fim}}
+
+async def buscar_colecao(colecao, data_filtrada, schema, apelido):
+    # Só dias passados são imutáveis e podem ser servidos do espelho em
+    # Parquet; o dia corrente é rebuscado inteiro, porque documentos do
+    # CRM são editados depois de criados (Status, quantidades etc.).
+    caminho = os.path.join(CACHE_DIR, f"{apelido}-{data_filtrada:%Y-%m-%d}.parquet")
+    dia_passado = data_filtrada < dt.date.today()
+    if dia_passado and os.path.exists(caminho):
+        return pd.read_parquet(caminho)
+
+    # find_arrow_all decodifica BSON direto em buffers colunares Arrow,
+    # sem materializar um dict por documento; roda em thread para não
+    # bloquear o loop e manter as duas buscas sobrepostas.
+    table = await asyncio.to_thread(get_db()[colecao].find_arrow_all, filtro_dia(data_filtrada), schema=schema)
+    df = table.to_pandas()
+    if dia_passado and not df.empty:
+        df.to_parquet(caminho)
+    return df
 
-def carregar_ordens():
-    try:
-        dados = list(db["Ordens de compra - CRM"].find())
-        return pd.DataFrame(dados) if dados else pd.DataFrame()
-    except Exception as e:
-        st.error(f"Erro ao carregar ordens: {e}")
-        return pd.DataFrame()
+async def buscar_dados(data_filtrada):
+    return await asyncio.gather(
+        buscar_colecao("Pedidos - CRM", data_filtrada, schema_pedidos, "pedidos"),
+        buscar_colecao("Ordens de compra - CRM", data_filtrada, schema_ordens, "ordens"),
+    )
+
+# Exceções propagam de propósito: st.cache_data não memoiza erros, então
+# uma falha transitória do Mongo não fica presa no cache pelo TTL inteiro.
+@st.cache_data(ttl=300, show_spinner=False)
+def carregar_dados(data_filtrada):
+    pedidos, ordens = rodar_async(buscar_dados(data_filtrada))
+    return pedidos, ordens
 
 def tratar_decimais(df, colunas):
+    presentes = [col for col in colunas if col in df.columns]
+    if presentes:
+        valores = df[presentes].apply(pd.to_numeric, errors="coerce").fillna(0).to_numpy(dtype="float32")
+        # garante bloco C-contíguo (cópias via .values podem sair em F-order)
+        df[presentes] = np.ascontiguousarray(valores)
+    return df
+
+def tratar_datas(df, colunas):
     for col in colunas:
         if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+            # utc=True normaliza valores com e sem tz em um único parse
+            df[col] = pd.to_datetime(df[col], errors="coerce", utc=True).dt.tz_localize(None)
     return df
 
-def tratar_datas(df, colunas):
+def tratar_categorias(df, colunas):
     for col in colunas:
         if col in df.columns:
-            df[col] = pd.to_datetime(df[col], errors="coerce")
-            if df[col].dt.tz is not None:
-                df[col] = df[col].dt.tz_convert(pytz.UTC)
-            df[col] = df[col].dt.tz_localize(None)
+            df[col] = df[col].astype("category")
     return df
 
-# ======= Cotação ao vivo via AwesomeAPI =======
-def obter_cotacao():
-    try:
-        url = "https://economia.awesomeapi.com.br/json/last/USD-BRL"
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        if "USDBRL" in data:
-            return float(data["USDBRL"]["bid"])
-        else:
-            st.warning(f"⚠️ Retorno inesperado da API: {data}")
-            return None
-    except Exception as e:
-        st.error(f"Erro ao obter cotação: {e}")
-        return None
+def mascara_categoria(serie, selecionados):
+    codigos = serie.cat.categories.get_indexer(pd.Index(selecionados))
+    return serie.cat.codes.isin(codigos[codigos >= 0])
 
-# ======= Histórico via AwesomeAPI =======
-def obter_historico():
-    try:
-        url = "https://economia.awesomeapi.com.br/json/daily/USD-BRL/100"
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
+# ======= AwesomeAPI (cotação + histórico) =======
+URL_COTACAO = "https://economia.awesomeapi.com.br/json/last/USD-BRL"
+URL_HISTORICO = "https://economia.awesomeapi.com.br/json/daily/USD-BRL/100"
 
-        if not isinstance(data, list) or len(data) == 0:
-            st.error(f"⚠️ Dados inválidos retornados da API: {data}")
-            return pd.DataFrame()
+@st.cache_resource
+def get_http_client():
+    # Cliente único por processo, usado no loop persistente: conexão
+    # keep-alive com a AwesomeAPI e, via HTTP/2, cotação e histórico
+    # multiplexados na mesma conexão quando voam juntos.
+    return httpx.AsyncClient(http2=True, timeout=5.0, headers={"Accept-Encoding": "gzip"})
 
-        df_hist = pd.DataFrame(data)
-        if 'timestamp' not in df_hist.columns or 'bid' not in df_hist.columns:
-            st.error(f"⚠️ Estrutura inesperada: {df_hist.head()}")
-            return pd.DataFrame()
+async def fetch_one(url):
+    resp = await get_http_client().get(url)
+    resp.raise_for_status()
+    return resp.json()
 
-        df_hist['timestamp'] = pd.to_datetime(df_hist['timestamp'], unit='s')
-        df_hist['bid'] = df_hist['bid'].astype(float)
-        df_hist = df_hist.sort_values('timestamp')
-        return df_hist
+def tratar_cotacao(data):
+    if data is None:
+        return None
+    if "USDBRL" in data:
+        return float(data["USDBRL"]["bid"])
+    st.warning(f"⚠️ Retorno inesperado da API: {data}")
+    return None
+
+def tratar_historico(data):
+    if not isinstance(data, list) or len(data) == 0:
+        st.error(f"⚠️ Dados inválidos retornados da API: {data}")
+        return pd.DataFrame()
 
+    df_hist = pd.DataFrame(data)
+    if 'timestamp' not in df_hist.columns or 'bid' not in df_hist.columns:
+        st.error(f"⚠️ Estrutura inesperada: {df_hist.head()}")
+        return pd.DataFrame()
+
+    df_hist['timestamp'] = pd.to_datetime(df_hist['timestamp'], unit='s')
+    df_hist['bid'] = df_hist['bid'].astype(float)
+    df_hist = df_hist.sort_values('timestamp')
+    return df_hist
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def carregar_historico():
+    try:
+        return tratar_historico(rodar_async(fetch_one(URL_HISTORICO)))
     except Exception as e:
         st.error(f"Erro ao obter histórico: {e}")
         return pd.DataFrame()
 
+# ======= Sidebar - data =======
+st.sidebar.header("Filtros")
+hoje = dt.datetime.now().date()
+data_filtrada = st.sidebar.date_input("Filtrar por data", value=hoje)
+
 # ======= Carregar dados do MongoDB =======
-pedidos_raw = carregar_pedidos()
-ordens_raw = carregar_ordens()
+try:
+    pedidos_raw, ordens_raw = carregar_dados(data_filtrada)
+except Exception as e:
+    st.error(f"Erro ao carregar dados do MongoDB: {e}")
+    pedidos_raw, ordens_raw = pd.DataFrame(), pd.DataFrame()
 
+# Dias sem movimento (fim de semana, feriado) não derrubam a página:
+# a cotação e os filtros continuam, as tabelas ficam vazias.
 if pedidos_raw.empty or ordens_raw.empty:
-    st.warning("⚠️ Nenhum dado encontrado no MongoDB. Verifique as coleções.")
-    st.stop()
+    st.warning("⚠️ Nenhum dado encontrado no MongoDB para a data selecionada.")
 
 # ======= Tratar pedidos =======
-colunas_pedidos = ['Assunto', 'Status', 'Hora de Criação', 'Condição de Pagamento', 'Pedido Filho?', 'Quantidade Total', 'Produtos']
-df_pedidos = pedidos_raw[colunas_pedidos].copy()
+df_pedidos = pedidos_raw.reindex(columns=colunas_pedidos)
 tratar_datas(df_pedidos, ["Hora de Criação"])
 tratar_decimais(df_pedidos, ["Quantidade Total"])
 df_pedidos = df_pedidos.rename(columns={"Produtos": "Produto", "Quantidade Total": "Qtd_Vendida"})
-df_pedidos['Data'] = df_pedidos['Hora de Criação'].dt.date
+tratar_categorias(df_pedidos, ["Status", "Condição de Pagamento", "Pedido Filho?"])
+df_pedidos['Data'] = df_pedidos['Hora de Criação'].dt.normalize()
 
 # ======= Tratar ordens =======
-colunas_ordens = ['Nome Produto', 'Quantidade Paga', 'Armazém', 'Hora de Criação', "Pedido de Compra"]
-df_ordens = ordens_raw[colunas_ordens].copy()
+df_ordens = ordens_raw.reindex(columns=colunas_ordens)
+tratar_datas(df_ordens, ["Hora de Criação"])
 tratar_decimais(df_ordens, ["Quantidade Paga"])
 df_ordens = df_ordens.rename(columns={"Nome Produto": "Produto", "Quantidade Paga": "Qtd_Comprada"})
-df_ordens['Data'] = pd.to_datetime(df_ordens['Hora de Criação']).dt.date
+tratar_categorias(df_ordens, ["Armazém"])
+df_ordens['Data'] = df_ordens['Hora de Criação'].dt.normalize()
 if "Número do Pedido" not in df_ordens.columns:
     df_ordens["Número do Pedido"] = df_ordens.index + 1
 
 # ======= Sidebar - filtros =======
-st.sidebar.header("Filtros")
-hoje = dt.datetime.now().date()
-data_filtrada = st.sidebar.date_input("Filtrar por data", value=hoje)
-
+# Uniques direto dos frames já carregados: são um dia só, o scan é barato,
+# e as opções nunca ficam defasadas em relação aos dados das tabelas.
 condicoes = df_pedidos["Condição de Pagamento"].dropna().unique()
 condicao_selecionada = st.sidebar.multiselect("Condição de Pagamento", options=condicoes, default=condicoes)
 
@@ -141,104 +251,147 @@ pedido_filho_selecionado = st.sidebar.multiselect("Pedido Filho?", options=ped_f
 status_options = df_pedidos["Status"].dropna().unique()
 status_selecionado = st.sidebar.multiselect("Status", options=status_options, default=status_options)
 
-armazens = df_ordens["Armazém"].dropna().unique() if "Armazém" in df_ordens.columns else []
+armazens = df_ordens["Armazém"].dropna().unique()
 armazem_selecionado = st.sidebar.multiselect("Armazém", options=armazens, default=armazens)
 
-# ======= Layout placeholders =======
-col1, col2 = st.columns([2, 1])
-grafico_placeholder = col1.empty()
-cards_placeholder = col2.empty()
-status_placeholder = st.empty()
+# ======= Cotação ao vivo (só este fragmento reroda a cada 60s) =======
+# Indexado por int(variacao >= 0): (cor da linha, cor do preenchimento)
+CORES_VARIACAO = (
+    ("red", 'rgba(255,0,0,0.2)'),
+    ("lime", 'rgba(0,255,0,0.2)'),
+)
 
-# ======= Loop principal =======
-while True:
+# Só a cor e os dois números mudam por ciclo; o resto do HTML é estático.
+CARDS_TEMPLATE = """
+<div style='display:flex; flex-direction:column; gap:20px; margin-top:10px;'>
+    <div style='background:#0e1117; padding:20px; border-radius:15px; text-align:center;
+                box-shadow:0 4px 10px rgba(0,0,0,0.4);'>
+        <h4 style='color:#aaa;'>💰 Dólar (ao vivo)</h4>
+        <h2 style='color:{cor};'>{cotacao_str}</h2>
+    </div>
+    <div style='background:#0e1117; padding:20px; border-radius:15px; text-align:center;
+                box-shadow:0 4px 10px rgba(0,0,0,0.4);'>
+        <h4 style='color:#aaa;'>📉 Variação (vs último fechamento)</h4>
+        <h2 style='color:{cor};'>{variacao_str}</h2>
+    </div>
+</div>
+"""
+
+def criar_figura():
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        mode='lines',
+        line=dict(width=3),
+        fill='tozeroy',
+        name='USD/BRL'
+    ))
+    fig.update_layout(
+        template='plotly_dark',
+        margin=dict(l=20, r=20, t=20, b=20),
+        xaxis_title="Data",
+        yaxis_title="Cotação (R$)",
+        height=420,
+        plot_bgcolor="#0e1117",
+        paper_bgcolor="#0e1117",
+    )
+    return fig
+
+@st.fragment(run_every=REFRESH_INTERVAL)
+def render_cotacao():
     try:
-        # --- Cotação ---
-        cotacao = obter_cotacao()
-        fuso = pytz.timezone("America/Sao_Paulo")
-        hora = dt.datetime.now(fuso).strftime("%H:%M:%S")
-
-        # --- Histórico ---
-        df_hist = obter_historico()
-        if df_hist.empty:
-            time.sleep(REFRESH_INTERVAL)
-            st.rerun()
-
-        ultimos_valores = df_hist['bid'].tolist()
-        fechamento_anterior = ultimos_valores[-2] if len(ultimos_valores) >= 2 else ultimos_valores[-1]
-        variacao = (ultimos_valores[-1] - fechamento_anterior) / fechamento_anterior * 100
-        cor_variacao = "lime" if variacao >= 0 else "red"
-        fill_color = 'rgba(0,255,0,0.2)' if cor_variacao == "lime" else 'rgba(255,0,0,0.2)'
-
-        # --- Gráfico ---
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df_hist['timestamp'],
-            y=df_hist['bid'],
-            mode='lines',
-            line=dict(color=cor_variacao, width=3),
-            fill='tozeroy',
-            fillcolor=fill_color,
-            name='USD/BRL'
-        ))
-        y_min, y_max = min(ultimos_valores), max(ultimos_valores)
-        y_margin = (y_max - y_min) * 0.08 if (y_max - y_min) > 0 else 0.2
-        fig.update_layout(
-            template='plotly_dark',
-            margin=dict(l=20, r=20, t=20, b=20),
-            xaxis_title="Data",
-            yaxis_title="Cotação (R$)",
-            height=420,
-            plot_bgcolor="#0e1117",
-            paper_bgcolor="#0e1117",
-            yaxis=dict(range=[y_min - y_margin, y_max + y_margin])
-        )
-        grafico_placeholder.plotly_chart(fig, use_container_width=True)
-
-        # --- Cards ---
-        cards_html = f"""
-        <div style='display:flex; flex-direction:column; gap:20px; margin-top:10px;'>
-            <div style='background:#0e1117; padding:20px; border-radius:15px; text-align:center;
-                        box-shadow:0 4px 10px rgba(0,0,0,0.4);'>
-                <h4 style='color:#aaa;'>💰 Dólar (ao vivo)</h4>
-                <h2 style='color:{cor_variacao};'>
-                    {f'R$ {cotacao:.4f}' if cotacao is not None else 'Sem dados'}
-                </h2>
-            </div>
-            <div style='background:#0e1117; padding:20px; border-radius:15px; text-align:center;
-                        box-shadow:0 4px 10px rgba(0,0,0,0.4);'>
-                <h4 style='color:#aaa;'>📉 Variação (vs último fechamento)</h4>
-                <h2 style='color:{cor_variacao};'>{variacao:+.2f}%</h2>
-            </div>
-        </div>
-        """
-        cards_placeholder.markdown(cards_html, unsafe_allow_html=True)
-
-        # ======= Aplicar filtros =======
-        df_pedidos_filtrado = df_pedidos[
-            (df_pedidos['Data'] == data_filtrada) &
-            (df_pedidos["Condição de Pagamento"].isin(condicao_selecionada)) &
-            (df_pedidos["Pedido Filho?"].isin(pedido_filho_selecionado)) &
-            (df_pedidos["Status"].isin(status_selecionado))
-        ]
-        df_ordens_filtrado = df_ordens[
-            (df_ordens['Data'] == data_filtrada) &
-            (df_ordens["Armazém"].isin(armazem_selecionado))
-        ]
-
-        # --- Tabelas ---
-        tabela1, tabela2 = st.columns(2)
-        with tabela1:
-            st.markdown("#### Pedidos de Venda")
-            st.dataframe(df_pedidos_filtrado[['Assunto', 'Produto', 'Qtd_Vendida', 'Data', 'Status']], use_container_width=True)
-        with tabela2:
-            st.markdown("#### Ordens de Compra")
-            st.dataframe(df_ordens_filtrado[['Pedido de Compra', 'Produto', 'Qtd_Comprada', 'Data']], use_container_width=True)
-
-        status_placeholder.info(f"🕒 Atualizado em {hora} — próxima atualização em {REFRESH_INTERVAL}s")
-
+        cotacao = tratar_cotacao(rodar_async(fetch_one(URL_COTACAO)))
     except Exception as e:
-        status_placeholder.error(f"Erro ao obter dados: {e}")
-
-    time.sleep(REFRESH_INTERVAL)
-    st.rerun()
+        st.error(f"Erro ao obter cotação: {e}")
+        cotacao = None
+    df_hist = carregar_historico()
+
+    hora = dt.datetime.now(SP_TZ).strftime("%H:%M:%S")
+    if df_hist.empty:
+        st.warning("⚠️ Histórico indisponível — tentando novamente no próximo ciclo.")
+        return
+
+    ultimos_valores = df_hist['bid'].tolist()
+    fechamento_anterior = ultimos_valores[-1]
+    if cotacao is not None:
+        variacao = (cotacao - fechamento_anterior) / fechamento_anterior * 100
+    else:
+        anterior = ultimos_valores[-2] if len(ultimos_valores) >= 2 else fechamento_anterior
+        variacao = (ultimos_valores[-1] - anterior) / anterior * 100
+    cor_variacao, fill_color = CORES_VARIACAO[int(variacao >= 0)]
+
+    col1, col2 = st.columns([2, 1])
+
+    # --- Gráfico (figura criada uma vez, só os dados mudam por ciclo) ---
+    if 'fig' not in st.session_state:
+        st.session_state['fig'] = criar_figura()
+    fig = st.session_state['fig']
+    fig.data[0].x = df_hist['timestamp']
+    fig.data[0].y = df_hist['bid']
+    fig.data[0].line.color = cor_variacao
+    fig.data[0].fillcolor = fill_color
+    y_min, y_max = min(ultimos_valores), max(ultimos_valores)
+    y_margin = (y_max - y_min) * 0.08 if (y_max - y_min) > 0 else 0.2
+    fig.layout.yaxis.range = [y_min - y_margin, y_max + y_margin]
+    col1.plotly_chart(fig, use_container_width=True)
+
+    # --- Cards ---
+    cards_html = CARDS_TEMPLATE.format(
+        cor=cor_variacao,
+        cotacao_str=f'R$ {cotacao:.4f}' if cotacao is not None else 'Sem dados',
+        variacao_str=f'{variacao:+.2f}%',
+    )
+    col2.markdown(cards_html, unsafe_allow_html=True)
+
+    st.info(f"🕒 Atualizado em {hora} — próxima atualização em {REFRESH_INTERVAL}s")
+
+render_cotacao()
+
+# ======= Aplicar filtros =======
+# Os loaders já devolvem somente o dia selecionado (filtro no Mongo),
+# então não há mais comparação por 'Data' aqui. As views são memoizadas
+# pelas seleções da sidebar (chaves pequenas), de modo que repetir a
+# mesma combinação reaproveita inclusive a serialização Arrow da tabela.
+# Como as funções leem df_pedidos/df_ordens dos globais (fora da chave),
+# a marca d'água do frame entra na chave para amarrar cada entrada à
+# safra de dados que a gerou — um TTL sozinho deixaria a view defasada
+# em até um ciclo inteiro quando as janelas não coincidem.
+def marca_dagua(df):
+    # resumo barato do conteúdo (o frame tem só um dia); captura também
+    # edições em documentos existentes, não só inserções
+    if df.empty:
+        return 0
+    return int(pd.util.hash_pandas_object(df, index=False).sum())
+
+@st.cache_data(ttl=300, show_spinner=False)
+def pedidos_view(data_filtrada, marca, condicoes, filhos, status):
+    mascara = (
+        mascara_categoria(df_pedidos["Condição de Pagamento"], condicoes) &
+        mascara_categoria(df_pedidos["Pedido Filho?"], filhos) &
+        mascara_categoria(df_pedidos["Status"], status)
+    )
+    return df_pedidos.loc[mascara, ['Assunto', 'Produto', 'Qtd_Vendida', 'Data', 'Status']]
+
+@st.cache_data(ttl=300, show_spinner=False)
+def ordens_view(data_filtrada, marca, armazens):
+    mascara = mascara_categoria(df_ordens["Armazém"], armazens)
+    return df_ordens.loc[mascara, ['Pedido de Compra', 'Produto', 'Qtd_Comprada', 'Data']]
+
+df_pedidos_filtrado = pedidos_view(
+    data_filtrada,
+    marca_dagua(df_pedidos),
+    tuple(condicao_selecionada),
+    tuple(pedido_filho_selecionado),
+    tuple(status_selecionado),
+)
+df_ordens_filtrado = ordens_view(data_filtrada, marca_dagua(df_ordens), tuple(armazem_selecionado))
+
+# --- Tabelas ---
+# 'Data' é datetime64 (meia-noite); exibe só a data, como antes.
+config_data = {"Data": st.column_config.DateColumn("Data", format="YYYY-MM-DD")}
+tabela1, tabela2 = st.columns(2)
+with tabela1:
+    st.markdown("#### Pedidos de Venda")
+    st.dataframe(df_pedidos_filtrado, use_container_width=True, column_config=config_data)
+with tabela2:
+    st.markdown("#### Ordens de Compra")
+    st.dataframe(df_ordens_filtrado, use_container_width=True, column_config=config_data)